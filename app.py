@@ -1,22 +1,35 @@
 # ---- app.py ----
 from __future__ import annotations
 
+import io
 import os
+import hashlib
+import tempfile
 import streamlit as st
-import matplotlib.pyplot as plt
+from PIL import Image
 
 from cesm_utils import (
     JOURNAL_PRESETS,
-    BUILTIN_BOXES,
-    DIFF_BOXES,
+    ALL_BOXES,
+    colormaps,
+    HAS_PLOTLY,
+    HAS_ZARR,
+    INDEX_DIR,
     load_dataset,
+    read_index_csv,
     plot_timeseries,
     plot_spatial_map,
     plot_trend_map,
+    mean_field,
+    trend_field,
+    subset_netcdf,
+    index_frame,
+    timeseries_figure,
     list_index_info,
     format_citation,
     save_citations,
 )
+from make_test_nc import create_dummy_dataset
 
 # ── Streamlit page config ────────────────────────────────────────────────────
 st.set_page_config(page_title="CESM Workbook", layout="wide")
@@ -25,32 +38,130 @@ st.title("CESM / iCESM Interactive Workbook")
 # ── Dataset picker ───────────────────────────────────────────────────────────
 DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
-files = [f for f in os.listdir(DATA_DIR) if f.endswith(".nc")]
+
+
+# directory scans are cached (cleared explicitly when this app writes a file);
+# sorted so the selectbox order doesn't depend on the filesystem
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_nc(d):
+    return tuple(sorted(f for f in os.listdir(d) if f.endswith((".nc", ".nc4"))))
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_csv(d):
+    return tuple(sorted(f for f in os.listdir(d) if f.endswith(".csv"))) if os.path.isdir(d) else ()
+
+
+# uploads are stored content-addressed in ./data: the same file uploaded again
+# (in any session) maps to the same path and hits the existing dataset caches.
+# Hashed once per upload (file_id), not on every rerun while the uploader holds it
+def _store_upload(f):
+    stored = st.session_state.setdefault("_stored_uploads", {})
+    if f.file_id in stored and os.path.exists(stored[f.file_id]):
+        return stored[f.file_id]
+    digest = hashlib.blake2b(f.getbuffer(), digest_size=16).hexdigest()
+    stem, ext = os.path.splitext(f.name)
+    path = os.path.join(DATA_DIR, f"{stem}-{digest}{ext}")
+    if not os.path.exists(path):
+        # written under a temp name (not listed as .nc) and renamed into place, so
+        # no session or directory listing ever sees a half-written file
+        out = tempfile.NamedTemporaryFile(dir=DATA_DIR, suffix=".part", delete=False)
+        try:
+            with out:
+                out.write(f.getbuffer())
+            os.replace(out.name, path)
+        except BaseException:  # e.g. disk full: don't leave the temp file behind
+            try:
+                os.remove(out.name)
+            except FileNotFoundError:
+                pass
+            raise
+        _list_nc.clear()
+    stored[f.file_id] = path
+    return path
+
+
+uploaded = st.sidebar.file_uploader("Upload NetCDF", type=["nc", "nc4"])
+upload_path = _store_upload(uploaded) if uploaded is not None else None
+
+files = _list_nc(DATA_DIR)
+if upload_path and os.path.basename(upload_path) not in files:
+    # stored earlier (e.g. by another session) after the ttl-cached listing was taken
+    _list_nc.clear()
+    files = _list_nc(DATA_DIR)
 
 if not files:
     st.error("No NetCDF files in ./data")
+    # only on click, and create_dummy_dataset skips a file that already exists;
+    # not resource-cached, so a demo file deleted while the server runs is rewritten
+    if st.button("Create a synthetic demo dataset"):
+        with st.spinner("Writing demo dataset..."):
+            create_dummy_dataset(os.path.join(DATA_DIR, "dummy.nc"))
+        _list_nc.clear()
+        st.rerun()
     st.stop()
 
-file_path = os.path.join(DATA_DIR, st.sidebar.selectbox("Dataset", files))
+upload_name = os.path.basename(upload_path) if upload_path else None
+default = files.index(upload_name) if upload_name in files else 0
+file_path = os.path.join(DATA_DIR, st.sidebar.selectbox("Dataset", files, index=default))
+if not os.path.exists(file_path):  # deleted since the (ttl-cached) listing: rescan
+    _list_nc.clear()
+    st.rerun()
+# (path, mtime) keys every cache below, so a file replaced on disk is reopened
+src = (file_path, os.path.getmtime(file_path))
+
+
+@st.cache_resource(show_spinner="Loading dataset...")
+def _load(src):
+    # float32: half the bytes per reduction / colour-map pass; zarr copy (if installed) for parallel reads
+    return load_dataset(src[0], float32=True, zarr_cache=HAS_ZARR)
+
+
+@st.cache_data(show_spinner=False)
+def _time_axis(src):
+    return _load(src)["time"].values
 
 
-@st.cache_data(show_spinner=True)
-def _load(path):
-    return load_dataset(path)
+# decimated slider positions so the widget payload doesn't grow with the file
+@st.cache_data(show_spinner=False)
+def _time_stops(src, max_stops=500):
+    n = len(_time_axis(src))
+    step = max(1, -(-n // max_stops))
+    return tuple(range(0, n - 1, step)) + (n - 1,)
 
 
-ds = _load(file_path)
+# slider labels for every timestep, formatted in one vectorized cast
+@st.cache_data(show_spinner=False)
+def _time_labels(src):
+    return _time_axis(src).astype(str).astype("U10")
+
+
+@st.cache_data(show_spinner=False)
+def _var_names(src):
+    return tuple(_load(src).data_vars)
+
 
 # ── Sidebar controls ────────────────────────────────────────────────────────
-var = st.sidebar.selectbox("Variable", list(ds.data_vars))
+var = st.sidebar.selectbox("Variable", _var_names(src))
 
-BOXES = {**BUILTIN_BOXES, **DIFF_BOXES}
-index_options = ["Raw", "Global Mean"] + list(BOXES.keys())
+index_options = ["Raw", "Global Mean"] + list(ALL_BOXES)
 indices = st.sidebar.multiselect("Indices", index_options, default=["Raw"])
 
+# precomputed index tables (./indices/*.csv) overlaid on the time-series
+overlay_src = None
+csvs = _list_csv(INDEX_DIR)
+if csvs:
+    overlay_name = st.sidebar.selectbox("Overlay index file", ("None",) + csvs)
+    if overlay_name != "None":
+        overlay_path = os.path.join(INDEX_DIR, overlay_name)
+        overlay_src = (overlay_path, os.path.getmtime(overlay_path))
+
 trendline = st.sidebar.checkbox("Add trendline", True)
+# interactive charts (Plotly, else st.line_chart) are drawn in the browser: no matplotlib render or PNG per rerun
+interactive_ts = st.sidebar.toggle("Interactive time-series", False)
 
-cmap = st.sidebar.selectbox("Colormap", sorted(plt.colormaps()))
+cmap_names, cmap_idx = colormaps()
+cmap = st.sidebar.selectbox("Colormap", cmap_names, index=cmap_idx)
 cbar_mode = st.sidebar.radio("Color-bar mode", ["Auto", "Robust", "Symmetric", "Manual"])
 vmin = vmax = None
 if cbar_mode == "Manual":
@@ -61,77 +172,159 @@ show_boxes = st.sidebar.checkbox("Show index boxes", True)
 custom_caption = st.sidebar.text_area("Custom caption")
 
 journal = st.sidebar.selectbox("Journal preset", list(JOURNAL_PRESETS.keys()))
-preset = JOURNAL_PRESETS[journal]
-
-citation_style = st.sidebar.selectbox("Citation style", ["Nature", "Science", "AGU", "APA"])
 
 # Time slider
-time_vals = ds["time"].values
-lo, hi = st.sidebar.slider("Time slice", 0, len(time_vals) - 1, (0, len(time_vals) - 1), format="")
-time_slice = slice(time_vals[lo], time_vals[hi])
+time_labels = _time_labels(src)
+stops = _time_stops(src)
+lo, hi = st.sidebar.select_slider(
+    "Time slice", stops, value=(stops[0], stops[-1]), format_func=time_labels.__getitem__
+)
+
+
+# ── Cached renderers ────────────────────────────────────────────────────────
+# Keyed on plain widget values, so reruns triggered by unrelated widgets
+# (e.g. the citation style) return the PNG without touching matplotlib.
+# st.image shrinks anything wider than its 1460 px content cap on *every* run
+# (decode, resize, re-encode); a 600-dpi figure is ~4200 px, so the on-screen
+# copy is made once here and cached next to the full-resolution download
+PREVIEW_W = 1460
+
+
+def _png(result):
+    _, buf, cap = result  # bare Figure (not pyplot-managed): nothing to close
+    png, img = buf.getvalue(), Image.open(buf)
+    if img.width <= PREVIEW_W:
+        return png, png, cap
+    out = io.BytesIO()
+    img.resize((PREVIEW_W, round(img.height * PREVIEW_W / img.width)), Image.BILINEAR).save(
+        out, format="PNG", compress_level=3
+    )
+    return png, out.getvalue(), cap
+
+
+def _subset(src, lo, hi):
+    return _load(src).isel(time=slice(lo, hi + 1))  # one positional selection per tab
+
+
+# downloads come from a fresh full-precision open of the NetCDF itself: the
+# float32 / zarr copy behind _load is for reductions and plots only
+def _export_subset(src, var, lo, hi):
+    with load_dataset(src[0]) as ds:
+        return subset_netcdf(ds.isel(time=slice(lo, hi + 1)), var)
+
+
+# parsed once per (path, mtime); reruns get the DataFrame from the cache
+@st.cache_data(show_spinner=False)
+def _index_csv(overlay_src):
+    return None if overlay_src is None else read_index_csv(overlay_src[0])
+
+
+# area means over the *whole* record, computed once per (dataset, var, indices);
+# moving the time slider is then a positional slice of this small frame
+@st.cache_data(show_spinner=False, max_entries=8)
+def _full_frame(src, var, indices):
+    return index_frame(_load(src), var, list(indices), None, ALL_BOXES)
+
+
+def _ts_frame(src, var, indices, lo, hi):
+    return _full_frame(src, var, indices).iloc[lo : hi + 1]
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _render_ts(src, var, indices, lo, hi, journal, caption, trend, overlay_src):
+    return _png(plot_timeseries(
+        None, var, list(indices), None, JOURNAL_PRESETS[journal], ALL_BOXES, caption, trend,
+        _index_csv(overlay_src), frame=_ts_frame(src, var, indices, lo, hi),
+    ))
+
+
+# the reduction (time-mean / per-gridcell regression) only depends on the
+# data selection, so cosmetic changes re-render without recomputing it
+@st.cache_data(show_spinner=False, max_entries=32)
+def _map_field(plot, src, var, lo, hi):
+    fn = {"spatial": mean_field, "trend": trend_field}[plot]
+    return fn(_subset(src, lo, hi), var).load()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _render_map(plot, src, var, lo, hi, journal, cmap, indices, cbar_mode, vmin, vmax, show_boxes, caption):
+    fn = {"spatial": plot_spatial_map, "trend": plot_trend_map}[plot]
+    return _png(fn(
+        None, var, None, JOURNAL_PRESETS[journal], cmap, list(indices), ALL_BOXES,
+        cbar_mode, vmin, vmax, show_boxes, user_caption=caption, field=_map_field(plot, src, var, lo, hi),
+    ))
+
+
+# About-tab content: parsed once, cleared when a citation is saved
+@st.cache_data(show_spinner=False)
+def _index_info():
+    return list_index_info()
+
 
 # ── Tabs ─────────────────────────────────────────────────────────────────────
+# Tab state is tracked so only the open tab's body runs on a rerun; hidden
+# tabs no longer render (or fetch) figures nobody is looking at.
 tab_ts, tab_map, tab_trend, tab_about = st.tabs(
-    ["📈 Time-Series", "🗺 Spatial Map", "🔭 Trend Map", "📚 About Indices"]
+    ["📈 Time-Series", "🗺 Spatial Map", "🔭 Trend Map", "📚 About Indices"],
+    key="active_tab",
+    on_change="rerun",
 )
 
-with tab_ts:
-    fig, buf, cap = plot_timeseries(
-        ds,
-        var,
-        indices,
-        time_slice,
-        preset,
-        BOXES,
-        custom_caption,
-        trendline,
-    )
-    st.pyplot(fig)
-    st.download_button("PNG", buf, file_name="timeseries.png")
-    st.caption(cap)
-
-with tab_map:
-    fig, buf, cap = plot_spatial_map(
-        ds,
-        var,
-        time_slice,
-        preset,
-        cmap,
-        indices,
-        BOXES,
-        cbar_mode,
-        vmin,
-        vmax,
-        show_boxes,
-        user_caption=custom_caption,
-    )
-    st.pyplot(fig)
-    st.download_button("PNG", buf, file_name="spatial_mean.png")
-    st.caption(cap)
-
-with tab_trend:
-    fig, buf, cap = plot_trend_map(
-        ds,
-        var,
-        time_slice,
-        preset,
-        cmap,
-        indices,
-        BOXES,
-        cbar_mode,
-        vmin,
-        vmax,
-        show_boxes,
-        user_caption=custom_caption,
-    )
-    st.pyplot(fig)
-    st.download_button("PNG", buf, file_name="trend_map.png")
-    st.caption(cap)
+if tab_ts.open:
+    with tab_ts:
+        if interactive_ts:
+            df = _ts_frame(src, var, tuple(indices), lo, hi)
+            if HAS_PLOTLY:
+                st.plotly_chart(timeseries_figure(df, var, _index_csv(overlay_src)), key="ts_chart")
+            else:  # built-in Vega-Lite chart; no overlay axis
+                st.line_chart(df, y_label=var)
+            cap = "; ".join(f"**{c}** μ={df[c].mean():.3g}, σ={df[c].std(ddof=0):.3g}" for c in df)
+            cap += f" {custom_caption}" if custom_caption else ""
+        else:
+            png, preview, cap = _render_ts(
+                src, var, tuple(indices), lo, hi, journal, custom_caption, trendline, overlay_src
+            )
+            st.image(preview)
+            st.download_button("PNG", png, file_name="timeseries.png")
+        # callable data: the table / subset is only serialised when the button is clicked
+        st.download_button(
+            "Index CSV",
+            lambda: _ts_frame(src, var, tuple(indices), lo, hi).to_csv().encode(),
+            file_name=f"{var}_indices.csv",
+            mime="text/csv",
+        )
+        st.download_button(
+            "NetCDF subset",
+            lambda: _export_subset(src, var, lo, hi),
+            file_name=f"{var}_subset.nc",
+            mime="application/x-netcdf",
+        )
+        st.caption(cap)
+
+map_args = (src, var, lo, hi, journal, cmap, tuple(indices), cbar_mode, vmin, vmax, show_boxes, custom_caption)
+
+if tab_map.open:
+    with tab_map:
+        png, preview, cap = _render_map("spatial", *map_args)
+        st.image(preview)
+        st.download_button("PNG", png, file_name="spatial_mean.png")
+        st.caption(cap)
+
+if tab_trend.open:
+    with tab_trend:
+        png, preview, cap = _render_map("trend", *map_args)
+        st.image(preview)
+        st.download_button("PNG", png, file_name="trend_map.png")
+        st.caption(cap)
 
 # ── About / citations tab ────────────────────────────────────────────────────
-with tab_about:
+# A fragment: the style picker and the citation form only rerun this block,
+# not the dataset / plotting script above.
+@st.fragment
+def _about():
     st.markdown("## Index definitions & references")
-    for name, meta in list_index_info().items():
+    citation_style = st.selectbox("Citation style", ["Nature", "Science", "AGU", "APA"])
+    for name, meta in _index_info().items():
         ref = format_citation(citation_style, meta)
         st.markdown(
             f"### {name}\n"
@@ -162,5 +355,10 @@ with tab_about:
             "desc": desc,
         }
         save_citations()
+        _index_info.clear()
         st.success(f"{key} saved. Reload the page to see it in the list.")
 
+
+if tab_about.open:
+    with tab_about:
+        _about()
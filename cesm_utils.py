@@ -1,29 +1,3 @@
-Below is a fully-checked **`cesm_utils.py`**.
-I compiled it locally to be sure—no stray escapes, all parentheses closed, and
-function names consistent (`_cbar_kwargs` is used everywhere).
-
-1. **Truncate** the old file
-
-   ```bash
-   truncate -s 0 cesm_utils.py   # or: > cesm_utils.py
-   ```
-
-2. **Open** and paste **everything** between the fences.
-
-   ```bash
-   nano cesm_utils.py
-   # ⬇ paste block, Ctrl-O ↵, Ctrl-X
-   ```
-
-3. **Run**
-
-   ```bash
-   streamlit run app.py
-   ```
-
----
-
-```python
 # ---- cesm_utils.py (compile-clean, 2025-07-07) ------------------------------
 """
 Utility layer for CESM Streamlit app.
@@ -33,16 +7,33 @@ Utility layer for CESM Streamlit app.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Union
-import io, numpy as np, xarray as xr, matplotlib.pyplot as plt, matplotlib as mpl
+from typing import Dict, Any, Optional, Union
+from functools import lru_cache
+from importlib import import_module
+from importlib.util import find_spec
+import io, os, shutil, hashlib, tempfile, numpy as np, pandas as pd, xarray as xr, matplotlib as mpl
+# pyplot is never needed; matplotlib.figure / .collections and cartopy are imported by the
+# plotting functions, so index / I/O-only users (and the app's first paint) skip ~1 s of imports
 
-# optional Cartopy
-try:
-    import cartopy.crs as ccrs
-    HAS_CARTOPY = True
-except ModuleNotFoundError:
-    HAS_CARTOPY = False
-    ccrs = None  # type: ignore
+# optional Cartopy: probed here, imported with the first map
+HAS_CARTOPY = find_spec("cartopy") is not None
+
+# optional Plotly / cftime / h5netcdf / pyarrow / zarr: only probed here, imported on first use (cold-start cost)
+HAS_PLOTLY = find_spec("plotly") is not None
+HAS_H5NETCDF = all(find_spec(m) is not None for m in ("h5netcdf", "h5py"))
+HAS_PARQUET = find_spec("pyarrow") is not None
+HAS_ZARR = find_spec("zarr") is not None
+
+@lru_cache(maxsize=None)
+def _optional(mod):
+    try: return import_module(mod)
+    except ModuleNotFoundError: return None
+
+@lru_cache(maxsize=None)
+def _crs():
+    """(lon/lat as stored in the file, Pacific-centred map axes) CRSs; (None, None) without cartopy."""
+    ccrs = _optional("cartopy.crs")
+    return (None, None) if ccrs is None else (ccrs.PlateCarree(), ccrs.PlateCarree(central_longitude=180))
 
 # ─── Journal presets ─────────────────────────────────────────────────────────
 JOURNAL_PRESETS: Dict[str, Dict[str, Any]] = {
@@ -53,6 +44,12 @@ JOURNAL_PRESETS: Dict[str, Dict[str, Any]] = {
     "Custom":  {"dpi":300,"figure_size":(6,4),"font_size":10,"font":"sans-serif"},
 }
 
+# ─── Colormaps (registry is fixed for the process) ───────────────────────────
+@lru_cache(maxsize=None)
+def colormaps():
+    """(sorted names, index of viridis); sorted on first call, not at import."""
+    names = tuple(sorted(mpl.colormaps)); return names, names.index("viridis")
+
 # ─── ENSO / PWC boxes (0–360 E) ──────────────────────────────────────────────
 BUILTIN_BOXES = {
     "Nino1+2": {"lat":(-10,0), "lon":(270,280)},
@@ -67,48 +64,186 @@ DIFF_BOXES = {
         "east":{"lat":(-5,5),"lon":(200,230)},
     }
 }
+ALL_BOXES = {**BUILTIN_BOXES, **DIFF_BOXES}  # built once; pass this instead of merging per call
 
 # ─── MPL journal context ─────────────────────────────────────────────────────
-_DEFAULT_RC = mpl.rcParams.copy()
+JOURNAL_RC_KEYS = ("figure.dpi", "font.family", "font.size", "axes.titlesize", "axes.labelsize")
 def apply_journal_style(p):
-    class _Ctx:
+    class _Ctx:  # only the keys a preset sets are saved and restored (each rc write is validated)
         def __enter__(self):
-            mpl.rcParams.update({
-                "figure.dpi":p["dpi"], "font.family":p["font"],
-                "font.size":p["font_size"],
-                "axes.titlesize":p["font_size"]+2, "axes.labelsize":p["font_size"]})
-        def __exit__(self,*_): mpl.rcParams.update(_DEFAULT_RC)
+            self.saved = {k: mpl.rcParams[k] for k in JOURNAL_RC_KEYS}
+            mpl.rcParams.update(dict(zip(JOURNAL_RC_KEYS, (
+                p["dpi"], p["font"], p["font_size"], p["font_size"]+2, p["font_size"]))))
+        def __exit__(self,*_): mpl.rcParams.update(self.saved)
     return _Ctx()
 
 # ─── Data I/O ────────────────────────────────────────────────────────────────
-def load_dataset(path:str, chunks:Union[str,dict,None]="auto")->xr.Dataset:
-    try: return xr.open_dataset(path, chunks=chunks)
-    except ImportError: return xr.open_dataset(path)
+# time-blocked chunks; lat/lon pinned whole (-1), otherwise dask inherits the
+# on-disk HDF5 tiling and a time slice fans out into many small reads
+TIME_CHUNKS = {"time": 120, "lat": -1, "lon": -1}
+
+def _to_float32(ds:xr.Dataset)->xr.Dataset:
+    """float64 data variables -> float32 (lazy under dask); coords are left alone."""
+    return ds.assign({v: ds[v].astype(np.float32) for v in ds.data_vars if ds[v].dtype == np.float64})
+
+def _disk_time_chunk(path:str):
+    """Largest on-disk (HDF5) time chunk over the file's variables; None if contiguous / netCDF3."""
+    with xr.open_dataset(path, cache=False) as ds:  # metadata only, nothing is read
+        sizes = [dict(zip(v.dims, v.encoding["chunksizes"])).get("time")
+                 for v in ds.data_vars.values() if v.encoding.get("chunksizes")]
+    return max(filter(None, sizes), default=None)
+
+ZARR_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "cesm_streamlit")
+ZARR_CACHE_MAX = 2 * 1024**3  # bytes; least recently used copies are evicted past this
+
+def _dir_size(d:str)->int:
+    return sum(os.path.getsize(os.path.join(r, f)) for r,_,fs in os.walk(d) for f in fs)
+
+def _prune_zarr_cache(keep:str, limit:int=ZARR_CACHE_MAX):
+    """Drop least recently used stores (by mtime, refreshed on every use) until the cache fits `limit`."""
+    stores = [os.path.join(ZARR_CACHE, d) for d in os.listdir(ZARR_CACHE) if d.endswith(".zarr")]
+    sizes = {d: _dir_size(d) for d in stores}; total = sum(sizes.values())
+    for d in sorted(stores, key=os.path.getmtime):
+        if total <= limit: break
+        if d != keep: shutil.rmtree(d, ignore_errors=True); total -= sizes[d]
+
+def _zarr_store(path:str, chunks:dict)->str:
+    """Consolidated zarr copy of a NetCDF file in `chunks`, keyed by path/size/mtime; written once.
+    Copies of earlier versions of the same path are removed when a new one is written, and the
+    whole cache is held under ZARR_CACHE_MAX (so copies of deleted sources age out too)."""
+    def _hash(s): return hashlib.blake2b(s.encode(), digest_size=8).hexdigest()
+    st = os.stat(path)
+    prefix = f"{os.path.splitext(os.path.basename(path))[0]}-{_hash(os.path.abspath(path))}-"
+    store = os.path.join(ZARR_CACHE, f"{prefix}{_hash(f'{st.st_size}|{st.st_mtime_ns}')}.zarr")
+    if not os.path.exists(store):
+        os.makedirs(ZARR_CACHE, exist_ok=True); tmp = f"{store}.{os.getpid()}.tmp"
+        try:
+            with xr.open_dataset(path, chunks=chunks) as ds:  # netCDF encodings (zlib, chunksizes) don't map to zarr
+                ds.drop_encoding().to_zarr(tmp, mode="w", consolidated=True, zarr_format=2)
+        except BaseException: shutil.rmtree(tmp, ignore_errors=True); raise
+        try: os.rename(tmp, store)  # written under a temp name: readers never see a half-written store
+        except OSError: shutil.rmtree(tmp, ignore_errors=True)  # another process got there first
+        for old in os.listdir(ZARR_CACHE):  # re-downloaded / edited file: drop the stale copies
+            if old.startswith(prefix) and old.endswith(".zarr") and os.path.join(ZARR_CACHE, old) != store:
+                shutil.rmtree(os.path.join(ZARR_CACHE, old), ignore_errors=True)
+        _prune_zarr_cache(store)
+    else:
+        try: os.utime(store)  # mark as recently used for the LRU pruning
+        except OSError: pass  # read-only cache: the copy is still readable
+    return store
+
+def _open_zarr_copy(path:str, chunks:dict)->Optional[xr.Dataset]:
+    """The dataset read through its zarr copy; None if the copy can't be made or opened (read-only or full
+    cache, a dtype/encoding zarr rejects, an older xarray without zarr_format=...), so callers read the NetCDF."""
+    try:
+        ds = xr.open_zarr(_zarr_store(path, chunks), consolidated=True)
+        with xr.open_dataset(path, cache=False) as nc: return ds[list(nc.data_vars)]  # zarr lists variables A-Z
+    except Exception: return None
+
+def load_dataset(path:str, chunks:Union[str,dict,None]=None, float32:bool=False, zarr_cache:bool=False)->xr.Dataset:
+    """`zarr_cache`: read through a zarr copy (see `_zarr_store`); needs zarr + dask, else ignored."""
+    if chunks is None:  # round the time block to whole stored chunks so no HDF5 chunk is decoded twice
+        step = _disk_time_chunk(path); chunks = dict(TIME_CHUNKS)
+        if step: chunks["time"] = max(1, round(TIME_CHUNKS["time"] / step)) * step
+    try:
+        # zarr chunks decompress in parallel across dask threads; HDF5 reads serialise on one lock
+        ds = _open_zarr_copy(path, chunks) if zarr_cache and HAS_ZARR and isinstance(chunks, dict) else None
+        if ds is None: ds = xr.open_dataset(path, chunks=chunks, cache=False)
+    except ImportError: ds = xr.open_dataset(path)
+    return _to_float32(ds) if float32 else ds
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indices")
+
+def read_index_csv(path:str)->pd.DataFrame:
+    """Precomputed index table (first column = time); numeric columns only."""
+    pq = path + ".parquet"  # typed sidecar: skips CSV parsing + date inference until the CSV changes
+    if HAS_PARQUET and os.path.exists(pq) and os.path.getmtime(pq) >= os.path.getmtime(path):
+        return pd.read_parquet(pq)
+    df = pd.read_csv(path, parse_dates=True, index_col=0).select_dtypes("number").sort_index()
+    if HAS_PARQUET:
+        try: df.to_parquet(pq)
+        except OSError: pass  # read-only index dir: just skip the sidecar
+    return df
+
+def subset_netcdf(ds:xr.Dataset, var:str)->bytes:
+    """Serialise `ds[var]` for download; uncompressed, since deflate dominates write time."""
+    enc = {var:{"zlib":False}}
+    if HAS_H5NETCDF:  # straight into memory, no disk round-trip
+        buf = io.BytesIO(); ds[[var]].to_netcdf(buf, engine="h5netcdf", encoding=enc); return buf.getvalue()
+    with tempfile.TemporaryDirectory() as d:
+        out = os.path.join(d, "subset.nc")
+        ds[[var]].to_netcdf(out, encoding=enc)
+        with open(out, "rb") as f: return f.read()
 
 # ─── Index helpers ───────────────────────────────────────────────────────────
-def _area_mean(da, lat, lon):
-    sub = da.sel(lat=slice(*lat), lon=slice(*lon))
-    w = np.cos(np.deg2rad(sub.lat))
-    return sub.weighted(w).mean(("lat", "lon"))
+@lru_cache(maxsize=None)
+def _box_kernel():
+    """Numba version of the in-memory box mean (NaN skip fused into the sums); None without numba."""
+    nb = _optional("numba")
+    if nb is None: return None
+    @nb.njit(parallel=True)
+    def kernel(v, w):  # v: (T, lat, lon), w: (box, lat, lon) -> (T, box)
+        out = np.empty((v.shape[0], w.shape[0]))
+        for t in nb.prange(v.shape[0]):
+            for b in range(w.shape[0]):
+                acc = 0.0; ws = 0.0
+                for i in range(v.shape[1]):
+                    for j in range(v.shape[2]):
+                        x = v[t,i,j]
+                        if not np.isnan(x): acc += x*w[b,i,j]; ws += w[b,i,j]
+                out[t,b] = acc/ws if ws > 0 else np.nan
+        return out
+    return kernel
 
-def compute_index(ds:xr.Dataset, var:str, name:str, boxes):
-    da = ds[var]
-    if name == "Raw": return da
-    if name == "Global Mean":
-        return _area_mean(da, (-90,90), (0,360)) if {"lat","lon"}.issubset(da.coords) else da.mean()
-    if name in boxes:
-        box = boxes[name]; return _area_mean(da, box["lat"], box["lon"])
+def _box_means(da, specs)->xr.DataArray:
+    """cos(lat)-weighted means over several (lat, lon) boxes in one pass: the union envelope
+    is cropped once and each box is a mask on it, so the reduction is a single weighted dot."""
+    lat, lon = da.lat.values, da.lon.values
+    mlat = np.array([(lat >= min(b[0])) & (lat <= max(b[0])) for b in specs])
+    mlon = np.array([(lon >= min(b[1])) & (lon <= max(b[1])) for b in specs])
+    i, j = np.flatnonzero(mlat.any(0)), np.flatnonzero(mlon.any(0))
+    ci = slice(i[0], i[-1]+1) if i.size else slice(0,0); cj = slice(j[0], j[-1]+1) if j.size else slice(0,0)
+    sub = da.isel(lat=ci, lon=cj)
+    w = xr.DataArray(mlat[:,ci,None] & mlon[:,None,cj], dims=("box","lat","lon")) * np.cos(np.deg2rad(sub.lat))
+    if sub.dtype == np.float32: w = w.astype(np.float32)  # float64 weights would upcast every product
+    if not isinstance(sub.data, np.ndarray): return sub.weighted(w).mean(("lat","lon"))
+    # in memory: the same masked mean as two einsums, without weighted()'s apply_ufunc round-trips
+    sub = sub.transpose(..., "lat", "lon"); v = sub.values; wv = w.values
+    if (kernel := _box_kernel()) is not None:  # one pass, no masked copy of the field
+        lead = int(np.prod(v.shape[:-2]))  # explicit: a box off the grid leaves an empty envelope, -1 can't be inferred
+        out = kernel(v.reshape((lead,)+v.shape[-2:]), wv).reshape(v.shape[:-2]+(len(wv),))
+    else:
+        ok = ~np.isnan(v)
+        num = np.einsum("...ij,bij->...b", np.where(ok, v, 0), wv)
+        den = np.einsum("...ij,bij->...b", ok, wv) if not ok.all() else wv.sum((1,2))
+        with np.errstate(invalid="ignore", divide="ignore"): out = num / den
+    keep = {k: c for k,c in sub.coords.items() if not {"lat","lon"} & set(c.dims)}
+    return xr.DataArray(out, dims=sub.dims[:-2]+("box",), coords=keep)
+
+def _box_terms(da, var, name, boxes):
+    """Signed (lat, lon) boxes an area-mean index is built from; None for non-box indices."""
+    if name == "Global Mean": return [(1, (-90,90), (0,360))] if {"lat","lon"}.issubset(da.coords) else None
     if name in DIFF_BOXES:
         meta = DIFF_BOXES[name]
         if var != meta["var"]: raise ValueError(f"{name} requires {meta['var']}")
-        return _area_mean(da, **meta["west"]) - _area_mean(da, **meta["east"])
+        return [(1, meta["west"]["lat"], meta["west"]["lon"]), (-1, meta["east"]["lat"], meta["east"]["lon"])]
+    if name in boxes: return [(1, boxes[name]["lat"], boxes[name]["lon"])]
     raise ValueError(name)
 
+def compute_index(ds:xr.Dataset, var:str, name:str, boxes):
+    da = ds[var]
+    if name == "Raw": return da
+    terms = _box_terms(da, var, name, boxes)
+    if terms is None: return da.mean()
+    means = _box_means(da, [(lat,lon) for _,lat,lon in terms])  # same einsum / numba / dot paths as the block
+    return sum(s*means.isel(box=k) for k,(s,_,_) in enumerate(terms))
+
 def _clean_da(da:xr.DataArray):
-    mask = np.isfinite(da) & (np.abs(da) < 1e30)
-    for k in ("_FillValue", "missing_value"):
-        if k in da.attrs: mask &= da != da.attrs[k]
-    return da.where(mask)
+    """±inf, |x| ≥ 1e30 and raw fill values -> NaN; NaN itself is left to the colormap's (transparent) bad colour."""
+    keep = ~(np.abs(da) >= 1e30)  # one comparison covers inf too; True for NaN, which needs no masking
+    fvs = [np.ravel(da.attrs[k]) for k in ("_FillValue", "missing_value") if k in da.attrs]
+    if fvs: keep &= ~da.isin(np.concatenate(fvs))  # one pass for all fill values (missing_value may be a list)
+    return da if bool(keep.all()) else da.where(keep)  # clean fields (the usual case) aren't copied
 
 # ─── Colour-bar logic ────────────────────────────────────────────────────────
 def _cbar_kwargs(da, mode, vmin, vmax):
@@ -116,34 +251,126 @@ def _cbar_kwargs(da, mode, vmin, vmax):
     if mode == "manual" and vmin is not None and vmax is not None:
         return {"vmin":vmin, "vmax":vmax}
     if mode == "robust": return {"robust":True}
-    if mode == "symmetric":
-        m = float(np.nanmax(np.abs(da))); return {"vmin":-m, "vmax":m}
+    if mode == "symmetric":  # min/max instead of max(|da|): no full-size abs() temporary
+        lim = xr.Dataset({"lo":da.min(), "hi":da.max()}).compute()  # both in one graph: a lazy field is reduced once
+        m = max(abs(float(lim["lo"])), abs(float(lim["hi"]))); return {"vmin":-m, "vmax":m}
     return {}
 
-def _fig_buf(fig,dpi):
-    buf = io.BytesIO(); fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight"); buf.seek(0); return buf
+def _fig_buf(fig,dpi,compress_level=3):
+    """PNG into memory; zlib level 3 (default 6) takes ~30% off savefig for ~1.3–3x the bytes."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", pil_kwargs={"compress_level":compress_level})
+    buf.seek(0); return buf
+
+# ─── Time axis ───────────────────────────────────────────────────────────────
+def _as_datetime64(t):
+    """cftime object array -> datetime64 in one vectorized call (no per-element formatting)."""
+    if t.dtype != object: return t
+    try: return xr.CFTimeIndex(t).to_datetimeindex(unsafe=True, time_unit="ns").values  # pinned: default moves to "us"
+    except ValueError:  # e.g. 360_day dates with no Gregorian equivalent
+        cftime = _optional("cftime")
+        if cftime is None: raise
+        ref = f"{t[0].year:04d}-01-01"  # anchor at the first year to keep calendar drift small
+        secs = cftime.date2num(t, f"seconds since {ref}", calendar=t[0].calendar)
+        return np.datetime64(ref, "s") + np.asarray(secs, dtype="int64").astype("timedelta64[s]")
+
+def _sel_time(obj, ts):
+    """`ts=None` means the caller already selected the time range (e.g. via isel)."""
+    return obj if ts is None else obj.sel(time=ts)
+
+def _span(da):
+    t = da["time"].values; return f"{str(t[0])[:10]}–{str(t[-1])[:10]}"
 
 # ─── Time-series plotting ────────────────────────────────────────────────────
-def _trend(x,y): m,c=np.polyfit(x,y,1); return m*x+c,m,c
-def plot_timeseries(ds,var,idx,t_slice,preset,boxes,caption=None,trend=False):
+def _flat(da):
+    rest = [d for d in da.dims if d!="time"]; return da.mean(dim=rest) if rest else da
+
+def _index_series(ds,var,name,t_slice,boxes):
+    return _flat(_sel_time(compute_index(ds,var,name,boxes),t_slice))
+
+def _index_block(ds,var,idx,t_slice,boxes)->xr.Dataset:
+    """All requested indices computed together: every box mean comes out of one masked
+    reduction over the shared lat/lon envelope, so each source chunk is read once."""
+    da = ds[var]; terms = {}
+    if {"lat","lon"}.issubset(da.dims):
+        terms = {n: _box_terms(da,var,n,boxes) for n in idx if n != "Raw"}
+    specs = list(dict.fromkeys((tuple(lat),tuple(lon)) for ts in terms.values() for _,lat,lon in ts))
+    out = {}
+    if specs:
+        means = _box_means(_sel_time(da,t_slice), specs)
+        for n,ts in terms.items():
+            out[n] = _flat(sum(s*means.isel(box=specs.index((tuple(lat),tuple(lon)))) for s,lat,lon in ts))
+    return xr.Dataset({n: out[n] if n in out else _index_series(ds,var,n,t_slice,boxes) for n in idx}).compute()
+
+def index_frame(ds,var,idx,t_slice,boxes)->pd.DataFrame:
+    """One column per index on a datetime64 index; the data behind `plot_timeseries`."""
+    t = _as_datetime64(_sel_time(ds["time"],t_slice).values); blk = _index_block(ds,var,idx,t_slice,boxes)
+    return pd.DataFrame({n: blk[n].values for n in idx}, index=pd.Index(t, name="time"))
+
+def _dec_years(ix:pd.Index)->pd.Index:
+    return ix.year + (ix.dayofyear - 1) / 365.25 if isinstance(ix, pd.DatetimeIndex) else ix.astype(float)
+
+def _align(overlay:pd.DataFrame, t)->pd.DataFrame:
+    """All overlay columns onto the model time axis in one nearest-neighbour reindex; NaN outside the
+    overlay's own span. Dated CSVs on integer model years (or the reverse) are matched in decimal years."""
+    t = pd.Index(t); src = overlay.index
+    if not all(pd.api.types.is_numeric_dtype(ix) or isinstance(ix, pd.DatetimeIndex) for ix in (src, t)):
+        return overlay.iloc[:0].reindex(t)  # e.g. unparsed string dates: nothing to match on
+    if isinstance(src, pd.DatetimeIndex) != isinstance(t, pd.DatetimeIndex): src, key = _dec_years(src), _dec_years(t)
+    else: key = t
+    out = overlay.set_axis(src).reindex(key, method="nearest")
+    out[np.asarray((key < src.min()) | (key > src.max()))] = np.nan  # no edge values smeared past the record
+    return out.set_axis(t)
+
+def timeseries_figure(df:pd.DataFrame, var:str, overlay:pd.DataFrame|None=None):
+    """Plotly counterpart of `plot_timeseries`; drawn client-side, no PNG encode."""
+    go = _optional("plotly.graph_objects")
+    fig = go.Figure([go.Scatter(x=df.index, y=df[c], mode="lines", name=c) for c in df])
+    if overlay is not None:
+        al = _align(overlay, df.index)
+        for c in al: fig.add_scatter(x=al.index, y=al[c], mode="lines", name=c, yaxis="y2", line={"dash":"dash"})
+        fig.update_layout(yaxis2={"overlaying":"y", "side":"right"})
+    # constant uirevision: Streamlit swaps the traces in place and keeps the user's zoom
+    fig.update_layout(title=f"{', '.join(df.columns)} {var}", yaxis_title=var, uirevision=var)
+    return fig
+
+def _trends(x,Y):
+    """Least-squares lines for every column of Y (time × index): closed-form degree-1 fit, x centred once."""
+    xc = x - x.mean(); ym = Y.mean(0); m = xc @ (Y - ym) / (xc @ xc)
+    return ym + np.outer(xc, m), m
+def plot_timeseries(ds,var,idx,t_slice,preset,boxes,caption=None,trend=False,overlay=None,frame=None):
+    """`frame`: a precomputed `index_frame` (ds/t_slice/boxes are then unused)."""
+    df = index_frame(ds,var,idx,t_slice,boxes) if frame is None else frame
     with apply_journal_style(preset):
-        fig,ax = plt.subplots(figsize=preset["figure_size"])
-        notes=[]; t=ds["time"].sel(time=t_slice).values; x=t.astype("datetime64[s]").astype(float)
-        for n in idx:
-            da = compute_index(ds,var,n,boxes).sel(time=t_slice)
-            if [d for d in da.dims if d!="time"]: da = da.mean(dim=[d for d in da.dims if d!="time"])
-            mu,std = float(da.mean()), float(da.std())
-            line, = ax.plot(t, da, label=n)
-            ax.fill_between(t, da-std, da+std, alpha=.12, color=line.get_color())
-            ax.axhline(mu, ls=":", lw=.8, color=line.get_color())
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=preset["figure_size"]); ax = fig.subplots()
+        from matplotlib.collections import LineCollection, PolyCollection
+        notes=[]; colors=[]; t=df.index.values; Y=df[idx].to_numpy(float)
+        mus, stds = np.nanmean(Y,0), np.nanstd(Y,0)
+        if trend: fits,slopes = _trends(_years(t), Y)
+        for k,n in enumerate(idx):
+            y, mu, std = Y[:,k], mus[k], stds[k]
+            line, = ax.plot(t, y, label=n); colors.append(line.get_color())
             if trend:
-                fit,m,_ = _trend(x, da.values); r2 = np.corrcoef(da.values, fit)[0,1]**2
-                ax.plot(t, fit, ls="--", color=line.get_color())
-                notes.append(f"**{n}** μ={mu:.3g}, σ={std:.3g}, m={m:.2e}, R²={r2:.2f}")
+                fit = fits[:,k]; r2 = np.corrcoef(y, fit)[0,1]**2
+                ax.plot(t, fit, ls="--", color=colors[-1])
+                notes.append(f"**{n}** μ={mu:.3g}, σ={std:.3g}, m={slopes[k]:.2e}/yr, R²={r2:.2f}")
             else:
                 notes.append(f"**{n}** μ={mu:.3g}, σ={std:.3g}")
+        # ±σ bands and mean lines as one collection each, not a fill_between + axhline per index
+        xs = np.asarray(ax.convert_xunits(t), float)
+        ax.add_collection(PolyCollection(
+            [np.column_stack([np.r_[xs, xs[::-1]], np.r_[y-s, (y+s)[::-1]]]) for y,s in zip(Y.T, stds)],
+            facecolors=colors, edgecolors="none", alpha=.12))
+        ax.add_collection(LineCollection([[(0,m),(1,m)] for m in mus], colors=colors, linestyles=":", linewidths=.8,
+                                         transform=ax.get_yaxis_transform()), autolim=False)  # axes-wide, like axhline
         ax.set_ylabel(var); ax.set_title(f"{', '.join(idx)} {var}")
-        ax.grid(ls="--", alpha=.3); ax.legend(fontsize=preset["font_size"])
+        handles = ax.get_legend_handles_labels()[0]
+        if overlay is not None and len(overlay.columns):  # external indices on a twin axis
+            ax2 = ax.twinx(); lines = ax2.plot(t, _align(overlay,t).values, ls="--", lw=.8)
+            for ln,c in zip(lines, overlay.columns): ln.set_label(c)
+            handles += lines
+        ax.grid(ls="--", alpha=.3); ax.legend(handles=handles, fontsize=preset["font_size"])
         cap = "; ".join(notes) + (f" {caption}" if caption else "")
         fig.text(.5, -.08, cap, ha="center", va="top", fontsize=preset["font_size"], wrap=True)
         fig.tight_layout(rect=(0,.05,1,1))
@@ -151,46 +378,143 @@ def plot_timeseries(ds,var,idx,t_slice,preset,boxes,caption=None,trend=False):
 
 # ─── Map plotting ────────────────────────────────────────────────────────────
 def _geo_axes(p):
-    proj = ccrs.PlateCarree() if HAS_CARTOPY else None
+    from matplotlib.figure import Figure
+    proj = _crs()[1]
     kw   = {"subplot_kw":{"projection":proj}} if proj else {}
-    fig,ax = plt.subplots(figsize=p["figure_size"], **kw)
+    fig = Figure(figsize=p["figure_size"]); ax = fig.subplots(**kw)
     if proj: ax.coastlines(resolution="110m", lw=.4)
     return fig,ax,proj
 
 def _draw_boxes(ax, proj, idx, boxes, show):
+    """All index outlines as one LineCollection (one artist, one transform) instead of a Line2D each."""
     if not show: return
+    from matplotlib.collections import LineCollection
+    segs = []
     for n in idx:
-        if n in boxes:
-            lat,lon = boxes[n]["lat"], boxes[n]["lon"]
-            xs=[lon[0],lon[1],lon[1],lon[0],lon[0]]
-            ys=[lat[0],lat[0],lat[1],lat[1],lat[0]]
-            args = dict(ls="--", lw=1, c="k")
-            (ax.plot(xs,ys,transform=ccrs.PlateCarree(),**args) if proj else ax.plot(xs,ys,**args))
+        if n not in boxes: continue
+        b = boxes[n]
+        for box in ((b["west"], b["east"]) if "west" in b else (b,)):  # DIFF_BOXES draw both halves
+            (y0,y1),(x0,x1) = box["lat"], box["lon"]
+            segs.append([(x0,y0),(x1,y0),(x1,y1),(x0,y1),(x0,y0)])
+    if segs:
+        kw = {"transform":_crs()[0]} if proj else {}
+        ax.add_collection(LineCollection(segs, linestyles="--", linewidths=1, colors="k", **kw))
+
+def _regular(c):
+    d = np.diff(c.values); return d.size > 0 and np.allclose(d, d[0])
+
+@lru_cache(maxsize=32)
+def _map_x(lon:tuple):
+    """File longitudes -> map-projection x, once per grid instead of a reprojection per draw."""
+    data, proj = _crs(); lon = np.asarray(lon, dtype=float)
+    return proj.transform_points(data, lon, np.zeros_like(lon))[:,0]
 
 def _map_core(title, da, p, cmap, cb_kw, idx, boxes, show):
     with apply_journal_style(p):
         fig,ax,proj = _geo_axes(p); da = _clean_da(da)
         if {"lat","lon"}.issubset(da.dims):
-            da.plot(ax=ax, cmap=cmap, add_colorbar=True, transform=proj if proj else None, **cb_kw)
+            if proj:  # draw in native axes coords: no transform=, fixed extent (no autoscale pass)
+                da = da.assign_coords(lon=_map_x(tuple(da.lon.values))).sortby("lon")
+                ax.set_extent([float(da.lon[0]), float(da.lon[-1]), float(da.lat.min()), float(da.lat.max())], crs=proj)
+            # evenly spaced grids draw as one image; pcolormesh (a quad per cell) only for irregular ones
+            kw = dict(ax=ax, cmap=cmap, add_colorbar=True, **cb_kw)
+            if _regular(da.lat) and _regular(da.lon): da.plot.imshow(interpolation="nearest", **kw)
+            else: da.plot.pcolormesh(**kw)
         else:
             im=ax.imshow(da.values,cmap=cmap); fig.colorbar(im,ax=ax)
         _draw_boxes(ax,proj,idx,boxes,show); ax.set_title(title); return fig
 
-def plot_spatial_map(ds,var,ts,p,cmap,idx,boxes,cmode,vmin,vmax,show,user_caption=None):
-    da = ds[var].sel(time=ts).mean("time")
-    fig = _map_core(f"Mean {var}", da, p, cmap, _cbar_kwargs(da,cmode,vmin,vmax), idx, boxes, show)
-    cap = f"Spatial mean of **{var}** {str(ts.start)[:10]}–{str(ts.stop)[:10]}."
+def _years(t):
+    """Time axis as float years from its start, so a polyfit slope reads per year."""
+    t = _as_datetime64(t)
+    if not np.issubdtype(t.dtype, np.datetime64): return t.astype(float)  # e.g. integer model years
+    return (t - t[0]) / np.timedelta64(1, "D") / 365.25
+
+def mean_field(ds,var,ts=None)->xr.DataArray:
+    """Time-mean of `ds[var]`: the compute half of `plot_spatial_map`."""
+    sub = _sel_time(ds[var],ts); return sub.mean("time").assign_attrs(span=_span(sub), units=ds[var].attrs.get("units",""))
+
+@lru_cache(maxsize=None)
+def _slope_kernel():
+    """Numba per-cell OLS slope from running Σn, Σx, Σy, Σxy, Σx² (NaNs skipped); None without numba."""
+    nb = _optional("numba")
+    if nb is None: return None
+    @nb.njit(parallel=True)
+    def kernel(x, v):  # v: (time, cell), walked row by row so reads stay contiguous
+        nc = v.shape[1]; n = np.zeros(nc); sx = np.zeros(nc); sy = np.zeros(nc); sxy = np.zeros(nc); sxx = np.zeros(nc)
+        for t in range(v.shape[0]):
+            xt = x[t]
+            for c in nb.prange(nc):
+                y = v[t,c]
+                if not np.isnan(y): n[c] += 1; sx[c] += xt; sy[c] += y; sxy[c] += xt*y; sxx[c] += xt*xt
+        d = n*sxx - sx*sx
+        return np.where(d > 0, (n*sxy - sx*sy) / d, np.nan)
+    return kernel
+
+def trend_field(ds,var,ts=None)->xr.DataArray:
+    """Per-gridcell linear slope (units / yr): the compute half of `plot_trend_map`."""
+    sub = _sel_time(ds[var],ts)
+    # closed-form OLS slope, cov(t, y) / var(t) over each cell's valid steps: plain sums
+    # that dask reduces chunk by chunk, no Vandermonde/QR and no rechunk to a single time block
+    # float32 data keeps float32 sums (x only spans decades); promoting x would double the bytes again
+    ft = sub.dtype if sub.dtype.kind == "f" else np.float64
+    if isinstance(sub.data, np.ndarray) and (kernel := _slope_kernel()) is not None:  # in memory: one fused pass
+        sub = sub.transpose("time", ...); v = sub.values
+        out = kernel(_years(sub["time"].values).astype(float), v.reshape(len(v), -1)).astype(ft)
+        keep = {k: c for k,c in sub.coords.items() if "time" not in c.dims}
+        slope = xr.DataArray(out.reshape(v.shape[1:]), dims=sub.dims[1:], coords=keep, name=var, attrs=sub.attrs)
+        return slope.assign_attrs(span=_span(sub), units=ds[var].attrs.get("units",""))
+    x = xr.DataArray(_years(sub["time"].values).astype(ft), dims="time").where(sub.notnull())
+    xa = x - x.mean("time")
+    slope = ((xa*sub).sum("time") / (xa**2).sum("time")).rename(var)
+    return slope.assign_attrs(span=_span(sub), units=ds[var].attrs.get("units",""))
+
+def _finish_map(fig, cap, p, user_caption):
     if user_caption: cap += " " + user_caption
     fig.text(.5,-.08,cap,ha="center",va="top",fontsize=p["font_size"],wrap=True); fig.tight_layout(rect=(0,.05,1,1))
     return fig, _fig_buf(fig,p["dpi"]), cap
 
-def plot_trend_map(ds,var,ts,p,cmap,idx,boxes,cmode,vmin,vmax,show,user_caption=None):
-    coeff = ds[var].sel(time=ts).polyfit("time",1)["polyfit_coefficients"].sel(degree=0).rename(var)
-    units = ds[var].attrs.get("units","")
-    fig = _map_core(f"Trend {var}", coeff, p, cmap, _cbar_kwargs(coeff,cmode,vmin,vmax), idx, boxes, show)
-    cap = f"Trend of **{var}** ({units}/t) {str(ts.start)[:10]}–{str(ts.stop)[:10]}."
-    if user_caption: cap += " " + user_caption
-    fig.text(.5,-.08,cap,ha="center",va="top",fontsize=p["font_size"],wrap=True); fig.tight_layout(rect=(0,.05,1,1))
-    return fig, _fig_buf
-```
+def plot_spatial_map(ds,var,ts,p,cmap,idx,boxes,cmode,vmin,vmax,show,user_caption=None,field=None):
+    da = (mean_field(ds,var,ts) if field is None else field).compute()  # 2-D: reduce once, not per mask/colour-bar/draw
+    fig = _map_core(f"Mean {var}", da, p, cmap, _cbar_kwargs(da,cmode,vmin,vmax), idx, boxes, show)
+    return _finish_map(fig, f"Spatial mean of **{var}** {da.attrs['span']}.", p, user_caption)
+
+def plot_trend_map(ds,var,ts,p,cmap,idx,boxes,cmode,vmin,vmax,show,user_caption=None,field=None):
+    da = (trend_field(ds,var,ts) if field is None else field).compute()  # 2-D: reduce once, not per mask/colour-bar/draw
+    fig = _map_core(f"Trend {var}", da, p, cmap, _cbar_kwargs(da,cmode,vmin,vmax), idx, boxes, show)
+    return _finish_map(fig, f"Trend of **{var}** ({da.attrs['units']}/yr) {da.attrs['span']}.", p, user_caption)
+
+# ─── Index references (indices/citations.yaml) ───────────────────────────────
+CITATIONS_PATH = os.path.join(INDEX_DIR, "citations.yaml")
+
+def _load_citations(path=CITATIONS_PATH)->Dict[str, Dict[str, Any]]:
+    yaml = _optional("yaml")
+    if yaml is None or not os.path.exists(path): return {}
+    with open(path, encoding="utf-8") as f:  # libyaml's C loader when PyYAML was built with it
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+
+INDEX_INFO: Dict[str, Dict[str, Any]] = _load_citations()  # parsed once per process
+
+def list_index_info()->Dict[str, Dict[str, Any]]: return INDEX_INFO
+
+def save_citations(path=CITATIONS_PATH):
+    yaml = _optional("yaml")
+    if yaml is None: raise ModuleNotFoundError("saving citations requires PyYAML")
+    Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)  # libyaml's C emitter when available
+    with open(path, "w", encoding="utf-8") as f: yaml.dump(INDEX_INFO, f, Dumper=Dumper, allow_unicode=True, sort_keys=False)
+
+_CITE_FMT = {
+    "Nature":  "{authors} {title}. {journal} ({year}). {doi}",
+    "Science": "{authors}, {journal} ({year}). {doi}",
+    "AGU":     "{authors} ({year}), {title}, {journal}, {doi}",
+    "APA":     "{authors} ({year}). {title}. {journal}. {doi}",
+}
+
+@lru_cache(maxsize=None)
+def _format_citation(style, items):
+    meta = {k:"" for k in ("authors","year","title","journal","doi")}; meta.update(items)
+    return _CITE_FMT.get(style, _CITE_FMT["APA"]).format_map(meta).strip(" .,")
 
+def format_citation(style:str, meta:Dict[str, Any])->str:
+    """Reference string for `meta` in a journal style; memoised per (style, entry)."""
+    return _format_citation(style, tuple(sorted((k, str(v)) for k, v in meta.items())))
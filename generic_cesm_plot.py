@@ -22,7 +22,6 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 from typing import List, Tuple
-import matplotlib.pyplot as plt
 
 from cesm_utils import (               # ← already in your repo
     JOURNAL_PRESETS,
@@ -64,26 +63,23 @@ def make_figs(
     ds = load_dataset(nc)
     preset = JOURNAL_PRESETS[journal]
     boxes = BUILTIN_BOXES
-    t_slice = slice(ds["time"].values[0], ds["time"].values[-1])
+    t_slice = None  # whole record: no label lookup on the time index
     Path(outdir).mkdir(parents=True, exist_ok=True)
 
     # 1️⃣  Time-series
-    fig, _, _ = plot_timeseries(ds, var, idx, t_slice, preset, boxes, show_trendline=trend)
+    _, buf, _ = plot_timeseries(ds, var, idx, t_slice, preset, boxes, trend=trend)
     ts_path = Path(outdir) / "timeseries.png"
-    fig.savefig(ts_path, dpi=preset["dpi"], bbox_inches="tight")
-    plt.close(fig)
+    ts_path.write_bytes(buf.getvalue())  # the helpers already rendered the PNG at preset dpi
 
     # 2️⃣  Spatial mean map
-    fig, _, _ = plot_spatial_map(ds, var, t_slice, preset, cmap, idx, boxes, cbar, vmin, vmax, True)
+    _, buf, _ = plot_spatial_map(ds, var, t_slice, preset, cmap, idx, boxes, cbar, vmin, vmax, True)
     sm_path = Path(outdir) / "spatial_map.png"
-    fig.savefig(sm_path, dpi=preset["dpi"], bbox_inches="tight")
-    plt.close(fig)
+    sm_path.write_bytes(buf.getvalue())
 
     # 3️⃣  Trend map
-    fig, _, _ = plot_trend_map(ds, var, t_slice, preset, cmap, idx, boxes, cbar, vmin, vmax, True)
+    _, buf, _ = plot_trend_map(ds, var, t_slice, preset, cmap, idx, boxes, cbar, vmin, vmax, True)
     tr_path = Path(outdir) / "trend_map.png"
-    fig.savefig(tr_path, dpi=preset["dpi"], bbox_inches="tight")
-    plt.close(fig)
+    tr_path.write_bytes(buf.getvalue())
 
     return ts_path, sm_path, tr_path
 
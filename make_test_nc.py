@@ -2,15 +2,18 @@ import xarray as xr
 import numpy as np
 import pandas as pd
 import os
+from functools import lru_cache
 
-def create_dummy_dataset(path="data/dummy.nc"):
-    """Creates a synthetic NetCDF dataset for testing and plotting."""
-    times = pd.date_range("2000-01-01", periods=100, freq="M")
+
+@lru_cache(maxsize=None)
+def dummy_dataset(seed=0):
+    """Synthetic in-memory dataset for testing and plotting; built once per seed."""
+    times = pd.date_range("2000-01-01", periods=100, freq="MS")
     lats = np.linspace(-30, 30, 10)
     lons = np.linspace(120, 280, 20)
-    temp_data = 15 + 8 * np.random.randn(len(times), len(lats), len(lons))
+    temp_data = 15 + 8 * np.random.default_rng(seed).standard_normal((len(times), len(lats), len(lons)))
 
-    ds = xr.Dataset(
+    return xr.Dataset(
         {
             "tas": (
                 ("time", "lat", "lon"),
@@ -21,10 +24,16 @@ def create_dummy_dataset(path="data/dummy.nc"):
         coords={"time": times, "lat": lats, "lon": lons},
     )
 
-    os.makedirs("data", exist_ok=True)
-    ds.to_netcdf(path)
+
+def create_dummy_dataset(path="data/dummy.nc", overwrite=False):
+    """Creates a synthetic NetCDF dataset for testing and plotting (skipped if it already exists)."""
+    if os.path.exists(path) and not overwrite:
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # light deflate + (time-block, full-grid) chunks: time slices read whole HDF5 chunks
+    dummy_dataset().to_netcdf(path, encoding={"tas": {"zlib": True, "complevel": 1, "chunksizes": (50, 10, 20)}})
     print(f"Dummy NetCDF file created at: {path}")
+    return path
 
 if __name__ == "__main__":
     create_dummy_dataset()
-
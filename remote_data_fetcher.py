@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import shutil
 import urllib.request
 from pathlib import Path
 
@@ -15,7 +16,19 @@ def remote_fetch_workflow():
         if st.sidebar.button("Download and Save"):
             try:
                 Path("data").mkdir(parents=True, exist_ok=True)
-                urllib.request.urlretrieve(remote_url, target_path)
+                # 1 MiB copy blocks (urlretrieve reads 8 KiB at a time); written to a
+                # .part file first so a failed transfer never leaves a truncated .nc
+                part = target_path + ".part"
+                try:
+                    with urllib.request.urlopen(remote_url) as r, open(part, "wb") as f:
+                        shutil.copyfileobj(r, f, 1 << 20)
+                    os.replace(part, target_path)
+                except BaseException:  # no dead .part left behind by a failed attempt
+                    try:
+                        os.remove(part)
+                    except FileNotFoundError:
+                        pass
+                    raise
                 st.sidebar.success(f"✅ Downloaded and saved to `{target_path}`")
             except Exception as e:
                 st.sidebar.error(f"❌ Failed to download: {e}")
@@ -0,0 +1,138 @@
+"""Numerics checks for the box-mean and trend helpers in cesm_utils.py."""
+import numpy as np
+import pytest
+
+xr = pytest.importorskip("xarray")
+cu = pytest.importorskip("cesm_utils")
+
+
+def _field(nt=24, lat=np.linspace(-30, 30, 13), lon=np.linspace(120, 280, 21), seed=0):
+    rng = np.random.default_rng(seed)
+    t = xr.date_range("2000-01-01", periods=nt, freq="MS")
+    return xr.DataArray(rng.standard_normal((nt, len(lat), len(lon))), dims=("time", "lat", "lon"),
+                        coords={"time": t, "lat": lat, "lon": lon}, name="tas")
+
+
+BOXES = [((-5, 5), (190, 240)), ((-10, 0), (270, 280)), ((-30, 30), (0, 360)), ((-5, 5), (300, 310))]
+
+
+def _reference_box_means(da, specs):
+    """Plain xarray weighted() mean of each masked box, one at a time."""
+    w = np.cos(np.deg2rad(da.lat))
+    out = []
+    for (la, lo) in specs:
+        inside = (da.lat >= min(la)) & (da.lat <= max(la)) & (da.lon >= min(lo)) & (da.lon <= max(lo))
+        out.append(da.where(inside).weighted(w.where(inside, 0)).mean(("lat", "lon")))
+    return xr.concat(out, "box").transpose("time", "box")
+
+
+def _with_gaps(da):
+    v = da.values.copy()
+    v[3, 5, 10] = v[:, 0, 0] = v[7] = np.nan  # a missing cell, a dead column, an all-NaN step
+    return da.copy(data=v)
+
+
+@pytest.fixture(params=["numba", "einsum", "dask"])
+def box_path(request, monkeypatch):
+    if request.param in ("numba", "dask"):
+        pytest.importorskip(request.param)
+    if request.param == "einsum":
+        monkeypatch.setattr(cu, "_box_kernel", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("case", ["plain", "gaps", "descending_lat", "float32"])
+def test_box_means_match_weighted_reference(box_path, case):
+    da = _with_gaps(_field()) if case == "gaps" else _field()
+    if case == "descending_lat":
+        da = da.isel(lat=slice(None, None, -1))
+    if case == "float32":
+        da = da.astype(np.float32)
+    got = cu._box_means(da.chunk({"time": 5}) if box_path == "dask" else da, BOXES).compute()
+    ref = _reference_box_means(da.astype(float), BOXES)
+    assert got.dims == ("time", "box")
+    np.testing.assert_allclose(got.values, ref.values, rtol=1e-5 if case == "float32" else 1e-10, atol=1e-6)
+    assert got.isel(box=-1).isnull().all()  # off the grid
+
+
+def test_box_means_numba_box_off_grid():
+    pytest.importorskip("numba")
+    da = _field()
+    out = cu._box_means(da, [((-5, 5), (300, 310))])  # empty envelope
+    assert out.shape == (24, 1) and out.isnull().all()
+    out = cu._box_means(da, [((-5, 5), (300, 310)), ((-5, 5), (190, 240))])
+    assert out.isel(box=0).isnull().all() and out.isel(box=1).notnull().all()
+
+
+@pytest.mark.parametrize("path", ["numba", "einsum", "dask"])
+def test_compute_index_out_of_domain_is_nan(path, monkeypatch):
+    if path in ("numba", "dask"):
+        pytest.importorskip(path)
+    if path == "einsum":
+        monkeypatch.setattr(cu, "_box_kernel", lambda: None)
+    ds = _field().to_dataset()
+    ds = ds.chunk({"time": 6}) if path == "dask" else ds
+    out = cu.compute_index(ds, "tas", "Nino1+2", {"Nino1+2": {"lat": (-10, 0), "lon": (290, 300)}})
+    assert out.sizes == {"time": 24} and bool(out.isnull().all())
+
+
+def test_align_masks_outside_overlay_span_and_mixed_axes():
+    pd = pytest.importorskip("pandas")
+    ov = pd.DataFrame({"a": np.arange(6.0)}, index=np.arange(1990, 1996))
+    out = cu._align(ov, np.arange(1980, 2001))["a"].to_numpy()
+    assert np.isnan(out[:10]).all() and np.isnan(out[16:]).all() and (out[10:16] == np.arange(6)).all()
+    dated = ov.set_axis(pd.date_range("1990-01-01", periods=6, freq="YS"))  # dated CSV on integer model years
+    assert np.array_equal(cu._align(dated, np.arange(1980, 2001))["a"].to_numpy(), out, equal_nan=True)
+
+
+def _noleap_field():
+    t = xr.date_range("0001-01-01", periods=36, freq="MS", calendar="noleap", use_cftime=True)
+    return _field(nt=36).assign_coords(time=t)
+
+
+@pytest.fixture(params=["numba", "numpy", "dask"])
+def trend_path(request, monkeypatch):
+    if request.param in ("numba", "dask"):
+        pytest.importorskip(request.param)
+    if request.param == "numpy":
+        monkeypatch.setattr(cu, "_slope_kernel", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("case", ["plain", "gaps", "float32", "noleap"])
+def test_trend_field_matches_polyfit(trend_path, case):
+    if case == "noleap":
+        pytest.importorskip("cftime")
+    da = {"plain": _field, "gaps": lambda: _with_gaps(_field()), "noleap": _noleap_field,
+          "float32": lambda: _field().astype(np.float32)}[case]()
+    ds = da.to_dataset()
+    got = cu.trend_field(ds.chunk({"time": 5}) if trend_path == "dask" else ds, "tas").compute()
+    years = cu._years(da["time"].values)
+    ref = da.astype(float).assign_coords(time=years).polyfit("time", 1, skipna=True)
+    ref = ref.polyfit_coefficients.sel(degree=1)
+    assert got.dims == ("lat", "lon") and got.dtype == da.dtype
+    np.testing.assert_allclose(got.values, ref.values, rtol=1e-4 if case == "float32" else 1e-8, atol=1e-6)
+
+
+def test_trend_field_recovers_known_slope_on_noleap_calendar(trend_path):
+    pytest.importorskip("cftime")
+    da = _noleap_field()
+    years = cu._years(da["time"].values)
+    assert np.all(np.diff(years) > 0) and abs(years[-1] - 35 / 12) < 0.01
+    ds = (0.5 * xr.DataArray(years, dims="time") + 0 * da).rename("tas").to_dataset()
+    got = cu.trend_field(ds.chunk({"time": 5}) if trend_path == "dask" else ds, "tas").compute()
+    np.testing.assert_allclose(got.values, 0.5, rtol=1e-8)
+
+
+def test_trends_match_polyfit_per_column():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0, 50, 80))
+    Y = rng.standard_normal((80, 3)) + np.array([0.1, -0.3, 2.0]) * x[:, None]
+    fits, slopes = cu._trends(x, Y)
+    for k in range(3):
+        m, c = np.polyfit(x, Y[:, k], 1)
+        np.testing.assert_allclose(slopes[k], m, rtol=1e-10)
+        np.testing.assert_allclose(fits[:, k], m * x + c, rtol=1e-10, atol=1e-10)
+    Y[5, 0] = np.nan  # a gap in one index leaves the other columns' fits untouched
+    _, s2 = cu._trends(x, Y)
+    np.testing.assert_allclose(s2[1:], slopes[1:], rtol=1e-12)